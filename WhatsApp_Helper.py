@@ -3,8 +3,10 @@ WhatsApp Helper Functions
 Handles all WhatsApp Web automation using Selenium.
 """
 
-import time
-import pyperclip
+import os
+import socket
+import threading
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -12,9 +14,152 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException,
+    WebDriverException
+)
 from loguru import logger
 
+# Driver-level implicit wait (seconds) used by plain find_element lookups
+IMPLICIT_WAIT = 3
+
+# Element locators (By, selector), CSS preferred over XPath where possible
+_APP_ROOT = (By.ID, "app")
+_QR_CODE = (By.CSS_SELECTOR, "canvas[aria-label='Scan me!']")
+_SEARCH_BOX = (By.CSS_SELECTOR, "div[contenteditable='true'][data-tab='3']")
+_SEARCH_RESULT = (By.CSS_SELECTOR, "div[role='listbox'] span[title]")
+_MESSAGE_INPUT = (By.CSS_SELECTOR, "div[contenteditable='true'][data-tab='10']")
+_OUTGOING_MESSAGE = (By.CSS_SELECTOR, "div[class*='message-out']")
+
+# Pastes arguments[1] into the contentEditable element arguments[0]
+_PASTE_TEXT_JS = """
+const el = arguments[0];
+el.focus();
+const dt = new DataTransfer();
+dt.setData('text/plain', arguments[1]);
+el.dispatchEvent(new ClipboardEvent('paste', {clipboardData: dt, bubbles: true}));
+"""
+
+_NEW_CHAT_SELECTORS = (
+    (By.CSS_SELECTOR, "div[title='New chat']"),
+    (By.CSS_SELECTOR, "button[aria-label='New chat']"),
+    (By.XPATH, "//span[@data-icon='new-chat-outline']/../.."),
+)
+
+# Any of these means a chat is open; one grouped selector = one round-trip
+_MSG_BOX_SELECTOR = (
+    By.CSS_SELECTOR,
+    "div[contenteditable='true'][data-tab='10'], "
+    "div[title='Type a message'], "
+    "span[data-icon='clip']"
+)
+
+
+# Hosts resolved once before the first driver.get so concurrently
+# launched Chrome instances hit a warm OS resolver cache
+_WHATSAPP_HOSTS = ("web.whatsapp.com", "static.whatsapp.net")
+_dns_lock = threading.Lock()
+_dns_warmed = False
+
+# Explicit wait poll interval (seconds); WebDriverWait defaults to 0.5
+POLL_FREQUENCY = 0.15
+
+
+def _wait(driver, timeout=5):
+    """Return a WebDriverWait that polls every POLL_FREQUENCY seconds."""
+    return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY)
+
+
+def _warm_dns():
+    """Resolve the WhatsApp hosts once; concurrent callers wait for the first."""
+    global _dns_warmed
+    with _dns_lock:
+        if _dns_warmed:
+            return
+        for host in _WHATSAPP_HOSTS:
+            try:
+                socket.gethostbyname(host)
+            except OSError as e:
+                logger.warning(f"DNS pre-resolution failed for {host}: {e}")
+        _dns_warmed = True
+
+
+def _new_search_box(old_boxes):
+    """
+    Wait condition: a displayed, enabled search box that was not on the
+    page before (the New Chat drawer's own input, not the sidebar's).
+    """
+    def condition(driver):
+        try:
+            for box in driver.find_elements(*_SEARCH_BOX):
+                if box not in old_boxes and box.is_displayed() and box.is_enabled():
+                    return box
+        except StaleElementReferenceException:
+            pass
+        return False
+    return condition
+
+
+def _active_search_box(driver):
+    """
+    Wait condition: the search box to type into, i.e. the focused one
+    (the drawer's input takes focus when it opens), else the last shown.
+    """
+    try:
+        boxes = [box for box in driver.find_elements(*_SEARCH_BOX) if box.is_displayed()]
+        if not boxes:
+            return False
+        active = driver.switch_to.active_element
+        return active if active in boxes else boxes[-1]
+    except StaleElementReferenceException:
+        return False
+
+
+def _search_result_for(phone):
+    """
+    Wait condition: the search result whose title is the typed phone
+    number (compared on its last 10 digits, ignoring formatting).
+    """
+    digits = "".join(c for c in phone if c.isdigit())[-10:]
+    
+    def condition(driver):
+        try:
+            for result in driver.find_elements(*_SEARCH_RESULT):
+                title = "".join(c for c in result.get_attribute("title") or "" if c.isdigit())
+                if digits and len(title) >= 7 and title[-10:] == digits:
+                    return result
+        except StaleElementReferenceException:
+            pass
+        return False
+    return condition
+
+
+def _profile_is_primed(profile_path):
+    """Return True if the Chrome profile already stores WhatsApp Web data."""
+    if not profile_path:
+        return False
+    leveldb = os.path.join(profile_path, 'Default', 'Local Storage', 'leveldb')
+    try:
+        with os.scandir(leveldb) as entries:
+            return next(entries, None) is not None
+    except OSError:
+        return False
+
+
+@contextmanager
+def _explicit_waits(driver):
+    """
+    Temporarily disable the implicit wait while explicit waits are used.
+    
+    Mixing both makes every failed lookup inside a WebDriverWait poll
+    block for the implicit timeout as well.
+    """
+    driver.implicitly_wait(0)
+    try:
+        yield
+    finally:
+        driver.implicitly_wait(IMPLICIT_WAIT)
+
 
 class WhatsAppHelper:
     def __init__(self, chromedriver_path):
@@ -25,6 +170,8 @@ class WhatsAppHelper:
             chromedriver_path (str): Path to ChromeDriver executable
         """
         self.chromedriver_path = chromedriver_path
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
     
     def setup_driver(self, profile_path, bot_name):
         """
@@ -51,6 +198,7 @@ class WhatsAppHelper:
             
             service = Service(self.chromedriver_path)
             driver = webdriver.Chrome(service=service, options=options)
+            driver.implicitly_wait(IMPLICIT_WAIT)
             
             # Remove webdriver property for anti-detection
             driver.execute_script(
@@ -63,8 +211,69 @@ class WhatsAppHelper:
             logger.critical(f"[{bot_name}] Driver setup failed: {e}")
             return None
     
+    def open_session(self, profile_path, bot_name):
+        """
+        Open a logged-in WhatsApp Web session for a bot, reusing a cached one.
+        
+        Args:
+            profile_path (str): Path to Chrome profile directory
+            bot_name (str): Name of the bot (session cache key)
+            
+        Returns:
+            webdriver.Chrome or None: Driver with WhatsApp Web loaded
+        """
+        with self._sessions_lock:
+            driver = self._sessions.get(bot_name)
+        if driver:
+            return driver
+        
+        driver = self.setup_driver(profile_path, bot_name)
+        if not driver:
+            return None
+        
+        _warm_dns()
+        try:
+            driver.get("https://web.whatsapp.com")
+            loaded = self.wait_for_whatsapp_load(driver, bot_name, profile_path=profile_path)
+        except WebDriverException as e:
+            logger.error(f"[{bot_name}] WhatsApp Web failed to load: {e}")
+            loaded = False
+        if not loaded:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+            return None
+        
+        with self._sessions_lock:
+            self._sessions[bot_name] = driver
+        return driver
+    
+    def close_session(self, bot_name):
+        """
+        Quit and forget the cached session of a bot.
+        
+        Args:
+            bot_name (str): Name of the bot
+        """
+        with self._sessions_lock:
+            driver = self._sessions.pop(bot_name, None)
+        if driver:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"[{bot_name}] Driver quit failed: {e}")
+            logger.info(f"[{bot_name}] Session closed")
+    
+    def close_all_sessions(self):
+        """Quit every cached session."""
+        with self._sessions_lock:
+            bot_names = list(self._sessions)
+        for bot_name in bot_names:
+            self.close_session(bot_name)
+    
     @staticmethod
-    def wait_for_whatsapp_load(driver, bot_name, timeout=30):
+    def wait_for_whatsapp_load(driver, bot_name, timeout=30, profile_path=None):
         """
         Wait for WhatsApp Web to fully load.
         
@@ -72,26 +281,48 @@ class WhatsAppHelper:
             driver: Selenium WebDriver instance
             bot_name (str): Name of the bot for logging
             timeout (int): Maximum wait time in seconds
+            profile_path (str, optional): Chrome profile directory; if it
+                already holds a WhatsApp session the QR check is skipped
             
         Returns:
             bool: True if loaded successfully, False otherwise
         """
         logger.info(f"[{bot_name}] Waiting for WhatsApp Web to load...")
         try:
-            # Wait for main app div
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.XPATH, "//div[@id='app']"))
-            )
-            time.sleep(3)
-            
-            # Check for QR code (first-time login)
-            if driver.find_elements(By.XPATH, "//canvas[@aria-label='Scan me!']"):
-                logger.warning(f"[{bot_name}] QR code detected - please scan to login")
-                WebDriverWait(driver, 60).until_not(
-                    EC.presence_of_element_located(
-                        (By.XPATH, "//canvas[@aria-label='Scan me!']")
+            with _explicit_waits(driver):
+                # Wait for main app div
+                _wait(driver, timeout).until(
+                    EC.presence_of_element_located(_APP_ROOT)
+                )
+                
+                # Logged-in profile: wait for the chat list directly
+                if _profile_is_primed(profile_path):
+                    try:
+                        _wait(driver, timeout).until(
+                            EC.presence_of_element_located(_SEARCH_BOX)
+                        )
+                        logger.success(f"[{bot_name}] WhatsApp Web loaded successfully")
+                        return True
+                    except TimeoutException:
+                        logger.warning(f"[{bot_name}] Saved session not restored, checking for QR code")
+                
+                # Wait for either the chat search box or the login QR code
+                _wait(driver, timeout).until(
+                    EC.any_of(
+                        EC.presence_of_element_located(_SEARCH_BOX),
+                        EC.presence_of_element_located(_QR_CODE)
                     )
                 )
+                
+                # Check for QR code (first-time login)
+                if driver.find_elements(*_QR_CODE):
+                    logger.warning(f"[{bot_name}] QR code detected - please scan to login")
+                    _wait(driver, 60).until_not(
+                        EC.presence_of_element_located(_QR_CODE)
+                    )
+                    _wait(driver, timeout).until(
+                        EC.presence_of_element_located(_SEARCH_BOX)
+                    )
             
             logger.success(f"[{bot_name}] WhatsApp Web loaded successfully")
             return True
@@ -104,25 +335,28 @@ class WhatsAppHelper:
         """
         Click the 'New Chat' button in WhatsApp Web.
         
+        Relies on the driver's implicit wait to poll for each selector.
+        
         Args:
             driver: Selenium WebDriver instance
             
         Returns:
             bool: True if successful, False otherwise
         """
-        selectors = [
-            "//div[@title='New chat']",
-            "//button[@aria-label='New chat']",
-            "//span[@data-icon='new-chat-outline']/../.."
-        ]
-        
-        for selector in selectors:
+        for locator in _NEW_CHAT_SELECTORS:
             try:
-                button = WebDriverWait(driver, 3).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
+                button = driver.find_element(*locator)
+            except NoSuchElementException:
+                continue
+            
+            try:
+                # The sidebar search box is already there; wait for the
+                # drawer's own box, not just any match
+                old_boxes = driver.find_elements(*_SEARCH_BOX)
                 driver.execute_script("arguments[0].click();", button)
-                time.sleep(1)
+                
+                with _explicit_waits(driver):
+                    _wait(driver).until(_new_search_box(old_boxes))
                 return True
             except:
                 continue
@@ -135,6 +369,9 @@ class WhatsAppHelper:
         """
         Search for and open a contact in WhatsApp Web.
         
+        Only a result titled with this phone number is opened, so a
+        contact shown under a saved name is reported as not found.
+        
         Args:
             driver: Selenium WebDriver instance
             phone (str): Phone number to search
@@ -143,36 +380,35 @@ class WhatsAppHelper:
             bool: True if contact found and opened, False otherwise
         """
         try:
-            # Find search box
-            search_box = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, "//div[@contenteditable='true'][@data-tab='3']")
-                )
-            )
-            
-            # Clear and enter phone number
-            search_box.send_keys(Keys.CONTROL + "a", Keys.BACKSPACE)
-            search_box.send_keys(phone)
-            time.sleep(3)
-            
-            # Press Enter to open chat
-            search_box.send_keys(Keys.ENTER)
-            time.sleep(2)
-            
-            # Verify chat opened by checking for message box
-            message_box_selectors = [
-                "//div[@contenteditable='true'][@data-tab='10']",
-                "//div[@title='Type a message']",
-                "//span[@data-icon='clip']"
-            ]
-            
-            for selector in message_box_selectors:
+            with _explicit_waits(driver):
+                # Find search box
+                search_box = _wait(driver).until(_active_search_box)
+                
+                # Clear and enter phone number
+                search_box.send_keys(Keys.CONTROL + "a", Keys.BACKSPACE)
+                search_box.send_keys(phone)
+                
+                # Wait for the result for this number and open that row;
+                # the unfiltered list may still be showing, so never just
+                # take the first result
                 try:
-                    element = driver.find_element(By.XPATH, selector)
-                    if element.is_displayed():
-                        return True
-                except:
-                    continue
+                    result = _wait(driver).until(_search_result_for(phone))
+                except TimeoutException:
+                    return False
+                result.click()
+                
+                # Wait for the chat message box (verified below on timeout)
+                try:
+                    _wait(driver).until(
+                        EC.presence_of_element_located(_MESSAGE_INPUT)
+                    )
+                except TimeoutException:
+                    pass
+                
+                # Verify chat opened by checking for message box
+                elements = driver.find_elements(*_MSG_BOX_SELECTOR)
+                if any(element.is_displayed() for element in elements):
+                    return True
             
             return False
         except Exception as e:
@@ -192,23 +428,28 @@ class WhatsAppHelper:
             bool: True if sent successfully, False otherwise
         """
         try:
-            # Find message input box
-            message_box = WebDriverWait(driver, 15).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//div[@contenteditable='true'][@data-tab='10']")
+            with _explicit_waits(driver):
+                # Find message input box
+                message_box = _wait(driver, 15).until(
+                    EC.element_to_be_clickable(_MESSAGE_INPUT)
                 )
-            )
-            
-            # Use clipboard to preserve formatting and emojis
-            pyperclip.copy(message_text)
-            message_box.click()
-            message_box.clear()
-            message_box.send_keys(Keys.CONTROL + "v")
-            time.sleep(1)
-            
-            # Send message
-            message_box.send_keys(Keys.ENTER)
-            time.sleep(2)
+                
+                # Dispatch a synthetic paste event to preserve formatting and
+                # emojis without touching the OS clipboard shared by all bots
+                driver.execute_script(_PASTE_TEXT_JS, message_box, message_text)
+                _wait(driver).until(lambda d: message_box.text.strip() != "")
+                
+                # Count outgoing bubbles so the new one can be detected
+                sent_before = len(driver.find_elements(*_OUTGOING_MESSAGE))
+                
+                # Send message
+                message_box.send_keys(Keys.ENTER)
+                try:
+                    _wait(driver, 10).until(
+                        lambda d: len(d.find_elements(*_OUTGOING_MESSAGE)) > sent_before
+                    )
+                except TimeoutException:
+                    logger.warning("Outgoing message bubble not detected after send")
             
             return True
         except Exception as e:
@@ -224,7 +465,10 @@ class WhatsAppHelper:
             driver: Selenium WebDriver instance
         """
         try:
-            driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
-            time.sleep(1)
+            with _explicit_waits(driver):
+                driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
+                _wait(driver, 3).until_not(
+                    EC.presence_of_element_located(_MESSAGE_INPUT)
+                )
         except:
             pass
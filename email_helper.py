@@ -3,19 +3,141 @@ Email Helper Functions
 Handles email notifications for errors and daily reports using SMTP.
 """
 
+import io
+import mmap
 import os
 import smtplib
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 from email.utils import formataddr
 from datetime import datetime
-from collections import defaultdict
+from string import Template
 from loguru import logger
 
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; screenshots are then sent as-is
+    Image = None
+
+# Screenshots wider than this are downscaled before attaching (needs Pillow)
+SCREENSHOT_MAX_WIDTH = 1280
+
+# Seconds between NOOPs keeping the persistent SMTP connection alive
+SMTP_HEARTBEAT_INTERVAL = 60
+
+# Errors meaning the SMTP connection is gone and should be reopened
+_SMTP_DROPPED = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+# HTML templates, parsed once at import
+_ERROR_HTML_TPL = Template("""
+        <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2 style="color: #d32f2f;">⚠️ WhatsApp Bot Error</h2>
+            <div style="background: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                <p><strong>Time:</strong> $time</p>
+                <p><strong>Bot:</strong> $bot_name</p>
+                <p><strong>Lead Name:</strong> $name</p>
+                <p><strong>Phone:</strong> $phone</p>
+                <p><strong>Program:</strong> $program</p>
+            </div>
+            
+            <h3 style="color: #666;">Error Details:</h3>
+            <pre style="background: #f4f4f4; padding: 15px; border-left: 4px solid #d32f2f; 
+                        overflow-x: auto; font-size: 12px;">$error_text</pre>
+            
+            <h3 style="color: #666;">Screenshot:</h3>
+            <img src="cid:screenshot" style="max-width: 800px; border: 1px solid #ddd;">
+            
+            <hr style="margin: 30px 0; border: none; border-top: 1px solid #ddd;">
+            <p style="color: #999; font-size: 12px;">
+                This is an automated notification from the WhatsApp Bot System.
+            </p>
+        </body>
+        </html>
+        """)
+
+_ROW_TPL = """
+            <tr>
+                <td style="padding: 10px; border: 1px solid #ddd;"><strong>{campus}</strong></td>
+                <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
+                           color: #4caf50;">{sent}</td>
+                <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
+                           color: #f44336;">{failed}</td>
+                <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">
+                    {notfound}</td>
+                <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
+                           font-weight: bold;">{total}</td>
+            </tr>
+            """
+
+_TOTAL_ROW_TPL = """
+        <tr style="background: #e3f2fd; font-weight: bold;">
+            <td style="padding: 10px; border: 1px solid #ddd;">TOTAL</td>
+            <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
+                       color: #4caf50;">{sent}</td>
+            <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
+                       color: #f44336;">{failed}</td>
+            <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">
+                {notfound}</td>
+            <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">
+                {total}</td>
+        </tr>
+        """
+
+_DAILY_HTML_TPL = Template("""
+        <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2 style="color: #1976d2;">📊 Daily WhatsApp Report</h2>
+            <p style="color: #666; font-size: 16px;">
+                $date
+            </p>
+            
+            <div style="background: #f5f5f5; padding: 20px; border-radius: 8px; 
+                        margin: 20px 0;">
+                <p style="font-size: 18px; margin: 5px 0;">
+                    <strong>Messages Sent:</strong> $total_sent / $grand_total
+                </p>
+                <p style="font-size: 24px; margin: 10px 0;">
+                    <strong style="color: $rate_color;">Success Rate: ${success_rate}%</strong>
+                </p>
+            </div>
+            
+            <table style="width: 100%; border-collapse: collapse; margin: 20px 0; 
+                          box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                <thead>
+                    <tr style="background: #1976d2; color: white;">
+                        <th style="padding: 12px; border: 1px solid #ddd; text-align: left;">
+                            Campus</th>
+                        <th style="padding: 12px; border: 1px solid #ddd;">Sent</th>
+                        <th style="padding: 12px; border: 1px solid #ddd;">Failed</th>
+                        <th style="padding: 12px; border: 1px solid #ddd;">Not Found</th>
+                        <th style="padding: 12px; border: 1px solid #ddd;">Total</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    $table_rows
+                    $total_row
+                </tbody>
+            </table>
+            
+            <hr style="margin: 30px 0; border: none; border-top: 1px solid #ddd;">
+            <p style="color: #999; font-size: 12px;">
+                <em>Report generated at $generated_at</em><br>
+                This is an automated daily report from the WhatsApp Bot System.
+            </p>
+        </body>
+        </html>
+        """)
+
 
 class EmailHelper:
-    def __init__(self, server, port, use_tls, username, password, sender):
+    def __init__(self, server, port, use_tls, username, password, sender,
+                 executor=None):
         """
         Initialize email helper with SMTP configuration.
         
@@ -26,6 +148,8 @@ class EmailHelper:
             username (str): SMTP username
             password (str): SMTP password
             sender (str): Sender email address
+            executor (Executor): Shared I/O pool for async sends; a private
+                two-worker pool is created when omitted
         """
         self.server = server
         self.port = port
@@ -33,6 +157,116 @@ class EmailHelper:
         self.username = username
         self.password = password
         self.sender = sender
+        self._smtp = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._heartbeat = None
+        # Background senders so SMTP latency stays off the bot threads
+        self._owns_exec = executor is None
+        self._exec = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix="email")
+    
+    def _connect(self):
+        """
+        Open and authenticate a new SMTP connection.
+        
+        Returns:
+            smtplib.SMTP: Logged-in SMTP connection
+        """
+        smtp = smtplib.SMTP(self.server, self.port, timeout=15)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+    
+    def _ensure(self):
+        """
+        Return the persistent SMTP connection, opening it if needed.
+        The first call also starts the NOOP heartbeat. Caller holds _lock.
+        
+        Returns:
+            smtplib.SMTP: Logged-in SMTP connection
+        """
+        if self._smtp is None:
+            self._smtp = self._connect()
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(
+                    target=self._heartbeat_loop, name="smtp-heartbeat", daemon=True
+                )
+                self._heartbeat.start()
+        return self._smtp
+    
+    def _drop_smtp(self):
+        """Forget a dead SMTP connection without attempting QUIT."""
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+    
+    def _heartbeat_loop(self):
+        """Send NOOP periodically so the server keeps the connection open."""
+        while not self._closed.wait(SMTP_HEARTBEAT_INTERVAL):
+            with self._lock:
+                if self._smtp is None:
+                    continue
+                try:
+                    code, _ = self._smtp.noop()
+                    if code != 250:
+                        self._drop_smtp()
+                except (smtplib.SMTPException, OSError):
+                    self._drop_smtp()
+    
+    def _deliver(self, msg):
+        """
+        Deliver a message over the persistent connection, reconnecting
+        once if the server has dropped it.
+        
+        Args:
+            msg (email.message.Message): Message to send
+        """
+        with self._lock:
+            try:
+                self._ensure().send_message(msg)
+            except _SMTP_DROPPED:
+                logger.warning("SMTP connection dropped, reconnecting")
+                self._drop_smtp()
+                self._ensure().send_message(msg)
+    
+    @staticmethod
+    def _load_screenshot(path):
+        """
+        Build the PNG attachment for a screenshot.
+        
+        Large screenshots are downscaled with Pillow when it is installed;
+        otherwise the file is memory-mapped rather than read into a buffer.
+        
+        Args:
+            path (str): Path to the PNG screenshot
+            
+        Returns:
+            MIMEImage or None: Attachment, or None for an empty file
+        """
+        if Image is not None:
+            try:
+                with Image.open(path) as im:
+                    if im.width > SCREENSHOT_MAX_WIDTH:
+                        height = round(im.height * SCREENSHOT_MAX_WIDTH / im.width)
+                        buf = io.BytesIO()
+                        im.resize(
+                            (SCREENSHOT_MAX_WIDTH, height), Image.LANCZOS
+                        ).save(buf, "PNG", optimize=True)
+                        return MIMEImage(buf.getvalue(), _subtype="png")
+            except Exception as e:
+                logger.warning(f"Screenshot downscale failed, attaching original: {e}")
+        
+        if os.path.getsize(path) == 0:
+            return None
+        
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return MIMEImage(mm, _subtype="png")
     
     def send_email(self, subject, html_body, to_email, screenshot_path=None):
         """
@@ -61,8 +295,8 @@ class EmailHelper:
             
             # Attach screenshot if provided
             if screenshot_path and os.path.exists(screenshot_path):
-                with open(screenshot_path, "rb") as f:
-                    img = MIMEImage(f.read(), _subtype="png")
+                img = self._load_screenshot(screenshot_path)
+                if img is not None:
                     img.add_header("Content-ID", "<screenshot>")
                     img.add_header(
                         "Content-Disposition",
@@ -72,11 +306,7 @@ class EmailHelper:
                     msg.attach(img)
             
             # Send email
-            with smtplib.SMTP(self.server, self.port, timeout=15) as smtp:
-                if self.use_tls:
-                    smtp.starttls()
-                smtp.login(self.username, self.password)
-                smtp.send_message(msg)
+            self._deliver(msg)
             
             logger.success(f"Email sent successfully to {to_email}")
             return True
@@ -84,6 +314,44 @@ class EmailHelper:
             logger.error(f"Failed to send email: {e}")
             return False
     
+    def send_email_async(self, *args, **kwargs):
+        """
+        Queue send_email on the background email pool.
+        
+        Returns:
+            concurrent.futures.Future: Resolves to the send_email result
+        """
+        return self._exec.submit(self.send_email, *args, **kwargs)
+    
+    def send_error_notification_async(self, *args, **kwargs):
+        """
+        Queue send_error_notification on the background email pool.
+        
+        Returns:
+            concurrent.futures.Future: Resolves to the send result
+        """
+        return self._exec.submit(self.send_error_notification, *args, **kwargs)
+    
+    def shutdown(self, wait=True):
+        """
+        Stop the background email pool and close the SMTP connection
+        (call once at program exit). A shared executor passed to __init__
+        is left to its owner.
+        
+        Args:
+            wait (bool): Block until queued emails have been sent
+        """
+        if self._owns_exec:
+            self._exec.shutdown(wait=wait)
+        self._closed.set()
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except Exception:
+                    self._smtp.close()
+                self._smtp = None
+    
     def send_error_notification(self, name, phone, program, bot_name, 
                                 error_text, screenshot_path, to_email):
         """
@@ -101,32 +369,14 @@ class EmailHelper:
         Returns:
             bool: True if sent successfully, False otherwise
         """
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif;">
-            <h2 style="color: #d32f2f;">⚠️ WhatsApp Bot Error</h2>
-            <div style="background: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                <p><strong>Time:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                <p><strong>Bot:</strong> {bot_name}</p>
-                <p><strong>Lead Name:</strong> {name}</p>
-                <p><strong>Phone:</strong> {phone}</p>
-                <p><strong>Program:</strong> {program}</p>
-            </div>
-            
-            <h3 style="color: #666;">Error Details:</h3>
-            <pre style="background: #f4f4f4; padding: 15px; border-left: 4px solid #d32f2f; 
-                        overflow-x: auto; font-size: 12px;">{error_text}</pre>
-            
-            <h3 style="color: #666;">Screenshot:</h3>
-            <img src="cid:screenshot" style="max-width: 800px; border: 1px solid #ddd;">
-            
-            <hr style="margin: 30px 0; border: none; border-top: 1px solid #ddd;">
-            <p style="color: #999; font-size: 12px;">
-                This is an automated notification from the WhatsApp Bot System.
-            </p>
-        </body>
-        </html>
-        """
+        html_body = _ERROR_HTML_TPL.substitute(
+            time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            bot_name=bot_name,
+            name=name,
+            phone=phone,
+            program=program,
+            error_text=error_text
+        )
         
         subject = f"🚨 WhatsApp Bot Error - {name} ({bot_name})"
         return self.send_email(subject, html_body, to_email, screenshot_path)
@@ -136,7 +386,8 @@ class EmailHelper:
         Send daily statistics report email.
         
         Args:
-            stats_rows (list): List of tuples (campus, status, count)
+            stats_rows (list): Rows of (mx_Program_Campus, Sent, Failed,
+                NotFound, Total), one per campus
             to_email (str): Recipient email
             
         Returns:
@@ -146,55 +397,32 @@ class EmailHelper:
             logger.info("No data for daily report")
             return False
         
-        # Group by campus
-        campus_data = defaultdict(lambda: {"Sent": 0, "Failed-Send": 0, 
-                                           "NotFound": 0, "total": 0})
-        
-        for row in stats_rows:
-            campus = row.mx_Program_Campus or "NULL"
-            status = row.Status_lead
-            count = row.cnt
-            campus_data[campus][status] += count
-            campus_data[campus]["total"] += count
-        
-        # Calculate totals
-        total_sent = sum(d["Sent"] for d in campus_data.values())
-        total_failed = sum(d["Failed-Send"] for d in campus_data.values())
-        total_notfound = sum(d["NotFound"] for d in campus_data.values())
+        # Calculate totals (rows are already aggregated per campus by SQL)
+        total_sent = sum(row.Sent for row in stats_rows)
+        total_failed = sum(row.Failed for row in stats_rows)
+        total_notfound = sum(row.NotFound for row in stats_rows)
         grand_total = total_sent + total_failed + total_notfound
         success_rate = round(total_sent / grand_total * 100, 1) if grand_total else 0
         
         # Build table rows
-        table_rows = ""
-        for campus, data in sorted(campus_data.items()):
-            table_rows += f"""
-            <tr>
-                <td style="padding: 10px; border: 1px solid #ddd;"><strong>{campus}</strong></td>
-                <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
-                           color: #4caf50;">{data['Sent']}</td>
-                <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
-                           color: #f44336;">{data['Failed-Send']}</td>
-                <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">
-                    {data['NotFound']}</td>
-                <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
-                           font-weight: bold;">{data['total']}</td>
-            </tr>
-            """
+        table_rows = "".join(
+            _ROW_TPL.format(
+                campus=row.mx_Program_Campus,
+                sent=row.Sent,
+                failed=row.Failed,
+                notfound=row.NotFound,
+                total=row.Total
+            )
+            for row in stats_rows
+        )
         
         # Total row
-        total_row = f"""
-        <tr style="background: #e3f2fd; font-weight: bold;">
-            <td style="padding: 10px; border: 1px solid #ddd;">TOTAL</td>
-            <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
-                       color: #4caf50;">{total_sent}</td>
-            <td style="padding: 10px; border: 1px solid #ddd; text-align: center; 
-                       color: #f44336;">{total_failed}</td>
-            <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">
-                {total_notfound}</td>
-            <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">
-                {grand_total}</td>
-        </tr>
-        """
+        total_row = _TOTAL_ROW_TPL.format(
+            sent=total_sent,
+            failed=total_failed,
+            notfound=total_notfound,
+            total=grand_total
+        )
         
         # Determine success color
         if success_rate >= 70:
@@ -205,50 +433,17 @@ class EmailHelper:
             rate_color = "#f44336"
         
         # Build HTML
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2 style="color: #1976d2;">📊 Daily WhatsApp Report</h2>
-            <p style="color: #666; font-size: 16px;">
-                {datetime.now().strftime('%A, %d %B %Y')}
-            </p>
-            
-            <div style="background: #f5f5f5; padding: 20px; border-radius: 8px; 
-                        margin: 20px 0;">
-                <p style="font-size: 18px; margin: 5px 0;">
-                    <strong>Messages Sent:</strong> {total_sent} / {grand_total}
-                </p>
-                <p style="font-size: 24px; margin: 10px 0;">
-                    <strong style="color: {rate_color};">Success Rate: {success_rate}%</strong>
-                </p>
-            </div>
-            
-            <table style="width: 100%; border-collapse: collapse; margin: 20px 0; 
-                          box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                <thead>
-                    <tr style="background: #1976d2; color: white;">
-                        <th style="padding: 12px; border: 1px solid #ddd; text-align: left;">
-                            Campus</th>
-                        <th style="padding: 12px; border: 1px solid #ddd;">Sent</th>
-                        <th style="padding: 12px; border: 1px solid #ddd;">Failed</th>
-                        <th style="padding: 12px; border: 1px solid #ddd;">Not Found</th>
-                        <th style="padding: 12px; border: 1px solid #ddd;">Total</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {table_rows}
-                    {total_row}
-                </tbody>
-            </table>
-            
-            <hr style="margin: 30px 0; border: none; border-top: 1px solid #ddd;">
-            <p style="color: #999; font-size: 12px;">
-                <em>Report generated at {datetime.now().strftime('%I:%M %p IST')}</em><br>
-                This is an automated daily report from the WhatsApp Bot System.
-            </p>
-        </body>
-        </html>
-        """
+        now = datetime.now()
+        html_body = _DAILY_HTML_TPL.substitute(
+            date=now.strftime('%A, %d %B %Y'),
+            total_sent=total_sent,
+            grand_total=grand_total,
+            rate_color=rate_color,
+            success_rate=success_rate,
+            table_rows=table_rows,
+            total_row=total_row,
+            generated_at=now.strftime('%I:%M %p IST')
+        )
         
         subject = f"📊 WhatsApp Daily Report - {total_sent}/{grand_total} ({success_rate}%)"
         return self.send_email(subject, html_body, to_email)
@@ -4,14 +4,46 @@ Handles all database operations including connections, queries, and data inserti
 """
 
 import pyodbc
+import threading
 import time
 from loguru import logger
 
+# Processed-phone exclusion strategy by set size: up to TVP_THRESHOLD phones
+# go inline as NOT IN, up to TEMP_TABLE_THRESHOLD as a table-valued parameter
+# (type dbo.PhoneList, see migrations/), and larger sets via a temp table
+TVP_THRESHOLD = 100
+TEMP_TABLE_THRESHOLD = 5000
+
+# Campus IN (...) placeholders are padded to a multiple of this for plan reuse
+CAMPUS_SLOTS = 4
+
+# Leads with a Lead_status record this recent are excluded server-side
+# (a 'Sent' record excludes them for good)
+RECENT_STATUS_DAYS = 1
+
+# Parameter types for Lead_status inserts, matching the table's columns, so
+# fast_executemany binds each column once instead of inferring it per row
+LEAD_STATUS_INPUT_SIZES = [
+    (pyodbc.SQL_WVARCHAR, 255, 0),  # lead_name
+    (pyodbc.SQL_WVARCHAR, 50, 0),   # Phone
+    (pyodbc.SQL_WVARCHAR, 255, 0),  # Program
+    (pyodbc.SQL_WVARCHAR, 255, 0),  # Degree_Awarding_Body
+    (pyodbc.SQL_WVARCHAR, 100, 0),  # mx_Program_Campus
+    (pyodbc.SQL_WVARCHAR, 50, 0),   # Status_lead
+    (pyodbc.SQL_TYPE_TIMESTAMP, 23, 3),  # Date_time (datetime)
+]
+
 
 class DatabaseHelper:
     def __init__(self, conn_str):
         """Initialize database helper with connection string."""
         self.conn_str = conn_str
+        # pyodbc connections must not be used by two threads at once, so
+        # each thread (lead producer, insert thread) keeps its own;
+        # short-lived threads call release() when done
+        self._tls = threading.local()
+        self._conns = set()
+        self._conns_lock = threading.Lock()
     
     def get_connection(self, max_retries=3):
         """
@@ -25,7 +57,9 @@ class DatabaseHelper:
         """
         for attempt in range(1, max_retries + 1):
             try:
-                conn = pyodbc.connect(self.conn_str, timeout=10)
+                conn = pyodbc.connect(self.conn_str, timeout=10, autocommit=False)
+                with self._conns_lock:
+                    self._conns.add(conn)
                 logger.success("DB Connected successfully")
                 return conn
             except Exception as e:
@@ -34,83 +68,268 @@ class DatabaseHelper:
                     time.sleep(5)
         return None
     
-    def fetch_leads(self, campuses, processed_phones, batch_size=5):
+    def _get_or_reconnect(self, max_retries=3):
+        """
+        Return this thread's connection, reconnecting if it is missing or dead.
+        
+        Args:
+            max_retries (int): Maximum number of connection attempts
+            
+        Returns:
+            pyodbc.Connection or None: Database connection object
+        """
+        conn = getattr(self._tls, "conn", None)
+        if conn is not None:
+            try:
+                conn.cursor().execute("SELECT 1").fetchall()
+                # autocommit is off: end the transaction the ping opened
+                conn.commit()
+                return conn
+            except pyodbc.Error as e:
+                logger.warning(f"DB connection lost, reconnecting: {e}")
+                self._discard_connection()
+        
+        self._tls.conn = self.get_connection(max_retries)
+        return self._tls.conn
+    
+    def _discard_connection(self):
+        """Close and forget this thread's connection so the next call reconnects."""
+        conn = getattr(self._tls, "conn", None)
+        if conn is not None:
+            with self._conns_lock:
+                self._conns.discard(conn)
+            try:
+                conn.close()
+            except pyodbc.Error:
+                pass
+            self._tls.conn = None
+    
+    def release(self):
+        """Close the calling thread's connection (call before the thread exits)."""
+        self._discard_connection()
+    
+    def close(self):
+        """Close every thread's connection (call once at shutdown)."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, set()
+        for conn in conns:
+            try:
+                conn.close()
+            except pyodbc.Error:
+                pass
+    
+    @staticmethod
+    def _campus_condition(campuses):
         """
-        Fetch leads from database based on campus assignments.
+        Build a fixed-shape SQL condition matching a bot's campus list.
+        
+        Campus slots are padded with NULLs, which never match IN, and the
+        NULL/NIL branches are switched on and off by 1/0 flags, so the
+        condition text (and its cached plan) is shared by every bot.
+        
+        Args:
+            campuses (list): Campus names, optionally including 'NULL'/'NIL'
+            
+        Returns:
+            tuple: (condition SQL, list of parameters)
+        """
+        non_null_campuses = [c for c in campuses if c not in ['NULL', 'NIL']]
+        slots = CAMPUS_SLOTS * max(1, -(-len(non_null_campuses) // CAMPUS_SLOTS))
+        campus_params = non_null_campuses + [None] * (slots - len(non_null_campuses))
+        
+        condition = (
+            f"(mx_Program_Campus IN ({','.join('?' * slots)})"
+            " OR (? = 1 AND mx_Program_Campus IS NULL)"
+            " OR (? = 1 AND mx_Program_Campus = 'NIL'))"
+        )
+        params = campus_params + [int('NULL' in campuses), int('NIL' in campuses)]
+        return condition, params
+    
+    @staticmethod
+    def _phone_exclusion(cur, processed_phones):
+        """
+        Build the filter excluding already processed phones.
+        
+        Short sets use an inline NOT IN list, moderate ones are shipped in
+        one RPC as a dbo.PhoneList table-valued parameter, and very large
+        ones are loaded into a session temp table #pp. The last two are
+        excluded with a server-side NOT EXISTS.
         
         Args:
-            campuses (list): List of campus names to fetch leads for
-            processed_phones (set): Set of already processed phone numbers
-            batch_size (int): Number of leads to fetch
+            cur: pyodbc cursor (used to populate #pp)
+            processed_phones (set): Already processed phone numbers
             
         Returns:
-            list: List of lead records or empty list on error
+            tuple: (filter SQL, list of parameters, whether #pp was created)
         """
-        conn = self.get_connection()
+        if len(processed_phones) > TEMP_TABLE_THRESHOLD:
+            cur.execute("IF OBJECT_ID('tempdb..#pp') IS NOT NULL DROP TABLE #pp")
+            cur.execute("CREATE TABLE #pp (Phone VARCHAR(50) PRIMARY KEY)")
+            cur.fast_executemany = True
+            cur.executemany(
+                "INSERT INTO #pp VALUES (?)",
+                [(p,) for p in processed_phones]
+            )
+            cur.fast_executemany = False
+            return (
+                "AND NOT EXISTS (SELECT 1 FROM #pp WHERE #pp.Phone = DUMY_LIVEDB.Phone)",
+                [],
+                True
+            )
+        
+        if len(processed_phones) > TVP_THRESHOLD:
+            # Leading strings give the TVP type name and schema to pyodbc
+            tvp = ["PhoneList", "dbo"] + [(p,) for p in processed_phones]
+            return (
+                "AND NOT EXISTS (SELECT 1 FROM ? AS pp WHERE pp.Phone = DUMY_LIVEDB.Phone)",
+                [tvp],
+                False
+            )
+        
+        if processed_phones:
+            placeholders = ','.join('?' for _ in processed_phones)
+            return f"AND Phone NOT IN ({placeholders})", list(processed_phones), False
+        
+        return "", [], False
+    
+    def fetch_leads_for_groups(self, campus_groups, processed_phones, batch_size=5):
+        """
+        Fetch leads for several campus groups (e.g. one per bot) in one query.
+        
+        Each lead is tagged server-side with the index of the first group
+        whose campuses it matches, and at most batch_size leads are returned
+        per group, so all bots can be fed by a single round-trip. Leads
+        already sent to, or with any Lead_status row in the last
+        RECENT_STATUS_DAYS days, are skipped. Lead_status.Phone holds the
+        source phone without '+', which is what this check matches on.
+        
+        Args:
+            campus_groups (list): List of campus lists, one per group
+            processed_phones (set): Phones handed out but not yet saved to
+                Lead_status
+            batch_size (int): Maximum number of leads per group
+            
+        Returns:
+            list: One list of lead records per group, or [] on error
+        """
+        if not campus_groups:
+            return []
+        
+        conn = self._get_or_reconnect()
         if not conn:
             return []
         
         try:
             cur = conn.cursor()
             
-            # Build exclusion list for processed phones
-            placeholders = ','.join('?' for _ in processed_phones)
-            
-            # Build campus filter
-            non_null_campuses = [c for c in campuses if c not in ['NULL', 'NIL']]
-            conditions = []
-            params = list(processed_phones)
-            
-            if non_null_campuses:
-                conditions.append(f"mx_Program_Campus IN ({','.join('?' * len(non_null_campuses))})")
-                params = non_null_campuses + params
+            phone_filter, phone_params, use_temp_table = self._phone_exclusion(
+                cur, processed_phones
+            )
             
-            if 'NULL' in campuses:
-                conditions.append("mx_Program_Campus IS NULL")
+            # Map each lead to its campus group
+            group_conditions = []
+            group_params = []
+            for condition, params in map(self._campus_condition, campus_groups):
+                group_conditions.append(condition)
+                group_params.extend(params)
             
-            if 'NIL' in campuses:
-                conditions.append("mx_Program_Campus = 'NIL'")
+            group_case = " ".join(
+                f"WHEN {condition} THEN {idx}"
+                for idx, condition in enumerate(group_conditions)
+            )
             
-            campus_filter = " OR ".join(conditions) if conditions else "1=0"
-            
-            # Construct query
+            # Construct query (predicates kept SARGable for the index
+            # IX_DUMY_LIVEDB_Phone_Owner, see README)
             query = f"""
-            SELECT TOP {batch_size} 
+            SELECT
                 Phone, 
                 FirstName, 
                 OwnerIdName, 
                 mx_Program_Name, 
-                mx_Program_Campus
-            FROM DUMY_LIVEDB
-            WHERE Phone IS NOT NULL 
-              AND LTRIM(RTRIM(Phone)) <> ''
-              AND OwnerIdName IN ('Texila American University', 'System')
-              AND mx_Program_Name IS NOT NULL
-              AND ({campus_filter})
-              {f'AND Phone NOT IN ({placeholders})' if processed_phones else ''}
-            ORDER BY Phone
+                mx_Program_Campus,
+                _grp
+            FROM (
+                SELECT
+                    Phone, 
+                    FirstName, 
+                    OwnerIdName, 
+                    mx_Program_Name, 
+                    mx_Program_Campus,
+                    _grp,
+                    ROW_NUMBER() OVER (PARTITION BY _grp ORDER BY Phone) AS rn
+                FROM (
+                    SELECT
+                        Phone, 
+                        FirstName, 
+                        OwnerIdName, 
+                        mx_Program_Name, 
+                        mx_Program_Campus,
+                        CASE {group_case} END AS _grp
+                    FROM DUMY_LIVEDB
+                    WHERE Phone > ''
+                      AND OwnerIdName IN ('Texila American University', 'System')
+                      AND mx_Program_Name IS NOT NULL
+                      AND ({' OR '.join(group_conditions)})
+                      AND NOT EXISTS (
+                          SELECT 1 FROM Lead_status ls
+                          WHERE ls.Phone = REPLACE(DUMY_LIVEDB.Phone, '+', '')
+                            AND (ls.Status_lead = 'Sent'
+                                 OR ls.Date_time > DATEADD(DAY, -?, GETDATE()))
+                      )
+                      {phone_filter}
+                ) AS leads
+            ) AS ranked
+            WHERE rn <= ?
+            ORDER BY _grp, Phone
             """
+            params = (
+                group_params
+                + group_params
+                + [RECENT_STATUS_DAYS]
+                + phone_params
+                + [batch_size]
+            )
             
             cur.execute(query, params)
             rows = cur.fetchall()
             
-            logger.success(f"Fetched {len(rows)} leads from database")
-            return rows
+            if use_temp_table:
+                cur.execute("DROP TABLE #pp")
+            
+            # End the read transaction (and any #pp work) so this thread's
+            # connection does not hold it open until the next poll
+            conn.commit()
             
+            # Demultiplex rows back to their groups
+            groups = [[] for _ in campus_groups]
+            for row in rows:
+                groups[row._grp].append(row)
+            
+            logger.success(f"Fetched {len(rows)} leads from database")
+            return groups
+        
+        except pyodbc.Error as e:
+            logger.error(f"Error fetching leads: {e}")
+            self._discard_connection()
+            return []
         except Exception as e:
             logger.error(f"Error fetching leads: {e}")
+            try:
+                conn.rollback()
+            except pyodbc.Error:
+                self._discard_connection()
             return []
-        finally:
-            conn.close()
     
     def insert_lead_status(self, results, max_retries=3):
         """
         Insert lead status records into database.
         
         Args:
-            results (list): List of result dictionaries to insert
+            results (list): Row tuples (or namedtuples) in column order
+                (lead_name, Phone, Program, Degree_Awarding_Body,
+                mx_Program_Campus, Status_lead, Date_time)
             max_retries (int): Maximum number of insertion attempts
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
@@ -118,7 +337,7 @@ class DatabaseHelper:
             return True
         
         for attempt in range(1, max_retries + 1):
-            conn = self.get_connection()
+            conn = self._get_or_reconnect()
             if not conn:
                 if attempt < max_retries:
                     time.sleep(10)
@@ -126,22 +345,16 @@ class DatabaseHelper:
             
             try:
                 cur = conn.cursor()
+                cur.fast_executemany = True
+                cur.setinputsizes(LEAD_STATUS_INPUT_SIZES)
                 
-                for record in results:
-                    cur.execute("""
-                    INSERT INTO Lead_status 
-                    (lead_name, Phone, Program, Degree_Awarding_Body, 
-                     mx_Program_Campus, Status_lead, Date_time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        record['lead_name'],
-                        record['Phone'],
-                        record['Program'],
-                        record['Degree_Awarding_Body'],
-                        record['mx_Program_Campus'],
-                        record['Status_lead'],
-                        record['Date_time']
-                    ))
+                # Send all rows in a single batched round-trip
+                cur.executemany("""
+                INSERT INTO Lead_status 
+                (lead_name, Phone, Program, Degree_Awarding_Body, 
+                 mx_Program_Campus, Status_lead, Date_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, results)
                 
                 conn.commit()
                 logger.success(f"Inserted {len(results)} records into Lead_status")
@@ -149,21 +362,25 @@ class DatabaseHelper:
                 
             except Exception as e:
                 logger.error(f"DB insert failed (attempt {attempt}/{max_retries}): {e}")
+                try:
+                    conn.rollback()
+                except pyodbc.Error:
+                    pass
+                # Drop the connection so the next attempt starts clean
+                self._discard_connection()
                 if attempt < max_retries:
                     time.sleep(10)
-            finally:
-                conn.close()
         
         return False
     
     def get_daily_stats(self):
         """
-        Fetch daily statistics for report generation.
+        Fetch daily statistics for report generation, aggregated per campus.
         
         Returns:
-            list: List of tuples containing campus, status, and count
+            list: Rows of (mx_Program_Campus, Sent, Failed, NotFound, Total)
         """
-        conn = self.get_connection()
+        conn = self._get_or_reconnect()
         if not conn:
             return []
         
@@ -171,17 +388,28 @@ class DatabaseHelper:
             cur = conn.cursor()
             cur.execute("""
                 SELECT 
-                    mx_Program_Campus, 
-                    Status_lead, 
-                    COUNT(*) as cnt
+                    ISNULL(mx_Program_Campus, 'NULL') AS mx_Program_Campus, 
+                    SUM(CASE WHEN Status_lead = 'Sent' THEN 1 ELSE 0 END) AS Sent, 
+                    SUM(CASE WHEN Status_lead = 'Failed-Send' THEN 1 ELSE 0 END) AS Failed, 
+                    SUM(CASE WHEN Status_lead = 'NotFound' THEN 1 ELSE 0 END) AS NotFound, 
+                    COUNT(*) AS Total
                 FROM Lead_status
-                WHERE CAST(Date_time AS DATE) = CAST(GETDATE() AS DATE)
-                GROUP BY mx_Program_Campus, Status_lead
+                WHERE Date_time >= CAST(GETDATE() AS DATE)
+                  AND Date_time < DATEADD(DAY, 1, CAST(GETDATE() AS DATE))
+                GROUP BY ISNULL(mx_Program_Campus, 'NULL')
+                ORDER BY mx_Program_Campus
             """)
             rows = cur.fetchall()
+            conn.commit()
             return rows
+        except pyodbc.Error as e:
+            logger.error(f"Error fetching daily stats: {e}")
+            self._discard_connection()
+            return []
         except Exception as e:
             logger.error(f"Error fetching daily stats: {e}")
+            try:
+                conn.rollback()
+            except pyodbc.Error:
+                self._discard_connection()
             return []
-        finally:
-            conn.close()
@@ -9,14 +9,23 @@ import json
 import time
 import random
 import threading
+import queue
 import traceback
-import re
-import pyautogui
-import schedule
-from datetime import datetime
+import atexit
+import ctypes
+import shutil
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from loguru import logger
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; config is then parsed with json
+    orjson = None
+
 from helpers import DatabaseHelper, WhatsAppHelper, MessageHelper, EmailHelper
 
 # Load environment variables
@@ -39,8 +48,8 @@ DB_CONN_STR = (
 )
 
 # Load bot configuration
-with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-    CONFIG = json.load(f)
+with open(CONFIG_FILE, 'rb') as f:
+    CONFIG = (orjson.loads if orjson else json.loads)(f.read())
 
 BOTS_CONFIG = CONFIG["bots"]
 SETTINGS = CONFIG["settings"]
@@ -51,25 +60,53 @@ BATCH_SIZE = SETTINGS.get("batch_size", 5)
 DELAY_MIN = SETTINGS.get("message_delay_min", 3)
 DELAY_MAX = SETTINGS.get("message_delay_max", 6)
 ANTI_LOCK_INTERVAL = SETTINGS.get("anti_lock_interval", 240)
+MAX_POLL_INTERVAL = SETTINGS.get("max_poll_interval", 300)
+# Longest a bot waits for the others' sessions (QR scans) before starting
+STARTUP_TIMEOUT = SETTINGS.get("startup_timeout", 300)
+
+# SetThreadExecutionState flags: keep the system and display awake
+ES_CONTINUOUS = 0x80000000
+ES_SYSTEM_REQUIRED = 0x00000001
+ES_DISPLAY_REQUIRED = 0x00000002
+
+# Characters not allowed in screenshot file names, mapped to '_'
+_UNSAFE_FILENAME_CHARS = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
 
 # Setup logging
 os.makedirs("logs", exist_ok=True)
 os.makedirs("errors", exist_ok=True)
 logger.remove()
+# enqueue=True hands records to a background writer so sink I/O and
+# rotation/compression never block the bot threads
 logger.add(
     sys.stdout,
     level="INFO",
     colorize=True,
-    format="<green>{time:HH:mm:ss}</green> | <level>{level}</level> | <white>{message}</white>"
+    format="<green>{time:HH:mm:ss}</green> | <level>{level}</level> | <white>{message}</white>",
+    enqueue=True
 )
 logger.add(
     "logs/bot_{time:YYYYMMDD}.log",
     level="DEBUG",
     rotation="7 days",
     retention="30 days",
-    compression="zip"
+    compression="zip",
+    enqueue=True
 )
 
+# Worker pools: ATP for network/DB/email I/O, WTP for local post-processing
+# (screenshot writes), so neither stalls the bot threads driving Selenium
+ATP = ThreadPoolExecutor(max_workers=32, thread_name_prefix="atp")
+WTP = ThreadPoolExecutor(max_workers=4, thread_name_prefix="wtp")
+# Lead_status inserts run on one dedicated thread, hence one DB connection;
+# it drains on its own and is only waited for at shutdown
+INSERT_EXEC = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-insert")
+
+# Phones handed to a bot whose Lead_status row is not saved yet. Lead polls
+# exclude them; once saved, the server-side Lead_status check takes over
+pending_phones = set()
+pending_lock = threading.Lock()
+
 # Initialize helpers
 db_helper = DatabaseHelper(DB_CONN_STR)
 whatsapp_helper = WhatsAppHelper(CHROMEDRIVER_PATH)
@@ -80,10 +117,45 @@ email_helper = EmailHelper(
     use_tls=os.getenv("MAIL_USE_TLS", "True").lower() in ("true", "1", "yes"),
     username=os.getenv("MAIL_USERNAME"),
     password=os.getenv("MAIL_PASSWORD"),
-    sender=os.getenv("MAIL_DEFAULT_SENDER")
+    sender=os.getenv("MAIL_DEFAULT_SENDER"),
+    executor=ATP
 )
 
 
+def report_send_error(png, screenshot_path, name, phone, program, bot_name, error_text):
+    """
+    Save an error screenshot and queue the error notification email.
+    Runs on the WTP pool; the email itself is sent from the ATP pool.
+    
+    Args:
+        png (bytes): Screenshot captured by the bot thread, or None
+        screenshot_path (str): Where to save the screenshot, or None
+        name (str): Lead name
+        phone (str): Phone number
+        program (str): Program name
+        bot_name (str): Bot identifier
+        error_text (str): Formatted traceback
+    """
+    if png:
+        try:
+            with open(screenshot_path, 'wb') as f:
+                f.write(png)
+        except OSError as e:
+            logger.warning(f"[{bot_name}] Could not save screenshot: {e}")
+            screenshot_path = None
+    
+    if REPORT_ERROR_TO:
+        email_helper.send_error_notification_async(
+            name=name,
+            phone=phone,
+            program=program,
+            bot_name=bot_name,
+            error_text=error_text,
+            screenshot_path=screenshot_path,
+            to_email=REPORT_ERROR_TO
+        )
+
+
 def send_whatsapp_message(driver, name, program, phone, bot_name):
     """
     Send a WhatsApp message to a lead.
@@ -117,32 +189,64 @@ def send_whatsapp_message(driver, name, program, phone, bot_name):
     except Exception as e:
         # Capture error screenshot
         error_id = datetime.now().strftime("%H%M%S")
-        safe_name = re.sub(r'[<>:"/\\|?*]', '_', name)
+        safe_name = name.translate(_UNSAFE_FILENAME_CHARS)
         screenshot_path = f"errors/error_{error_id}_{safe_name}_{bot_name}.png"
         
+        # Grab the PNG on this thread (the driver is not thread-safe);
+        # writing it out and emailing happen on the worker pools
         try:
-            driver.save_screenshot(screenshot_path)
+            png = driver.get_screenshot_as_png()
         except:
+            png = None
             screenshot_path = None
         
-        # Log and send error notification
-        error_text = traceback.format_exc()
-        logger.error(f"[{bot_name}] Error sending message: {error_text}")
+        # Log and send error notification; the traceback is only formatted
+        # when it is emailed or actually written to the log
+        error_text = traceback.format_exc() if REPORT_ERROR_TO else None
+        logger.opt(lazy=True).error(
+            "[{}] Error sending message: {}",
+            lambda: bot_name, lambda: error_text or traceback.format_exc()
+        )
         
-        if REPORT_ERROR_TO:
-            email_helper.send_error_notification(
-                name=name,
-                phone=phone,
-                program=program,
-                bot_name=bot_name,
-                error_text=error_text,
-                screenshot_path=screenshot_path,
-                to_email=REPORT_ERROR_TO
+        if png or REPORT_ERROR_TO:
+            WTP.submit(
+                report_send_error, png, screenshot_path,
+                name, phone, program, bot_name, error_text
             )
         
         return False
 
 
+# One Lead_status row, fields in column order; executemany takes it as-is
+LeadStatusRow = namedtuple("LeadStatusRow", [
+    "lead_name", "Phone", "Program", "Degree_Awarding_Body",
+    "mx_Program_Campus", "Status_lead", "Date_time"
+])
+
+
+def lead_status_row(lead, status):
+    """
+    Build the Lead_status row for a lead.
+    
+    Args:
+        lead: Database row containing lead information
+        status (str): Status_lead value
+        
+    Returns:
+        LeadStatusRow: Row in Lead_status column order
+    """
+    return LeadStatusRow(
+        lead.FirstName or "Student",
+        # Source phone without '+', as matched by the lead poll
+        str(lead.Phone).replace('+', ''),
+        lead.mx_Program_Name or "Unknown",
+        lead.OwnerIdName,
+        str(lead.mx_Program_Campus or "NULL"),
+        status,
+        datetime.now()
+    )
+
+
 def process_lead(driver, lead, bot_name):
     """
     Process a single lead: search contact and send message.
@@ -153,18 +257,16 @@ def process_lead(driver, lead, bot_name):
         bot_name (str): Bot identifier
         
     Returns:
-        dict: Result dictionary with status information
+        LeadStatusRow: Lead_status row for the lead
     """
-    raw_phone = str(lead.Phone)
     name = lead.FirstName or "Student"
     program = lead.mx_Program_Name or "Unknown"
-    owner = lead.OwnerIdName
-    campus = lead.mx_Program_Campus or "NULL"
     
-    # Clean and validate phone number
-    phone = message_helper.clean_phone_number(raw_phone)
+    # Clean and validate phone number; invalid ones are still recorded so
+    # the poll stops returning them
+    phone = message_helper.clean_phone_number(str(lead.Phone))
     if not phone:
-        return None
+        return lead_status_row(lead, "InvalidPhone")
     
     status = "Pending"
     
@@ -191,79 +293,225 @@ def process_lead(driver, lead, bot_name):
                 break
                 
         except Exception as e:
-            logger.error(f"[{bot_name}] Attempt {attempt + 1} failed: {e}")
+            # Full traceback only once the retry has also failed
             if attempt == 1:
                 status = "Error"
+                logger.opt(lazy=True).error(
+                    "[{}] Error after retry: {!r}\n{}",
+                    lambda: bot_name, lambda: e, traceback.format_exc
+                )
+            else:
+                logger.warning(f"[{bot_name}] Attempt {attempt + 1} failed: {e!r}")
             time.sleep(5)
     
     # Close chat and add delay
     whatsapp_helper.close_chat(driver)
     time.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
     
-    # Return result
-    return {
-        'lead_name': name,
-        'Phone': phone.replace('+', ''),
-        'Program': program,
-        'Degree_Awarding_Body': owner,
-        'mx_Program_Campus': str(campus),
-        'Status_lead': status,
-        'Date_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
+    return lead_status_row(lead, status)
+
+
+def release_phones(phones):
+    """
+    Drop phones from pending_phones so later polls may return them again
+    (subject to the server-side Lead_status check).
+    
+    Args:
+        phones (iterable): Source phone numbers (str(lead.Phone))
+    """
+    with pending_lock:
+        pending_phones.difference_update(phones)
+
+
+def save_lead_status(row, phone):
+    """
+    Insert one Lead_status row, then release its phone from pending_phones.
+    A phone whose row could not be saved stays pending, so the lead is not
+    messaged again by this process.
+    
+    Args:
+        row (LeadStatusRow): Lead_status row from process_lead
+        phone (str): Source phone number (str(lead.Phone))
+        
+    Returns:
+        bool: True if the row was saved
+    """
+    if db_helper.insert_lead_status([row]):
+        release_phones([phone])
+        return True
+    logger.error(f"Lead_status row for {phone} not saved; keeping it pending")
+    return False
 
 
-def run_bot(bot_name, campuses, profile_path):
+def lead_producer(bot_queues, lead_demand):
     """
-    Main bot loop - continuously processes leads.
+    Poll leads for every bot in one query and route them to per-bot queues.
+    
+    Queued leads are added to pending_phones so they are not fetched again
+    before their Lead_status row is saved; a lead whose bot queue is full
+    is left for a later poll.
+    
+    Args:
+        bot_queues (dict): Bot name -> bounded queue.Queue of leads, for
+            the bots still running (guarded by pending_lock)
+        lead_demand (threading.Event): Set by a bot whose queue ran dry
+    """
+    # Idle wait: doubles while no leads turn up, drops back after work
+    idle_backoff = POLL_INTERVAL
+    
+    while True:
+        try:
+            lead_demand.clear()
+            with pending_lock:
+                exclude = set(pending_phones)
+                live_bots = list(bot_queues.items())
+            campus_groups = [BOTS_CONFIG[bot_name]["campuses"] for bot_name, _ in live_bots]
+            groups = db_helper.fetch_leads_for_groups(
+                campus_groups, exclude, BATCH_SIZE
+            )
+            
+            queued = 0
+            with pending_lock:
+                for (bot_name, work_q), leads in zip(live_bots, groups):
+                    # Skip a bot that stopped while the fetch was running
+                    if bot_name not in bot_queues:
+                        continue
+                    for lead in leads:
+                        phone = str(lead.Phone)
+                        if phone in pending_phones:
+                            continue
+                        try:
+                            work_q.put_nowait(lead)
+                        except queue.Full:
+                            break
+                        pending_phones.add(phone)
+                        queued += 1
+            
+            if queued:
+                idle_backoff = POLL_INTERVAL
+            else:
+                idle_backoff = min(idle_backoff * 2, MAX_POLL_INTERVAL)
+            
+            # Wake early when a bot has drained its queue
+            lead_demand.wait(min(idle_backoff, MAX_POLL_INTERVAL))
+        
+        except Exception as e:
+            logger.critical(f"Lead producer error: {e}")
+            time.sleep(POLL_INTERVAL)
+
+
+def next_batch(work_q, lead_demand):
+    """
+    Block for the next lead, then take any others already queued.
+    
+    Once the queue is drained the producer is asked for more straight
+    away, so the next DB fetch overlaps the sends and human-like delays
+    of this batch instead of waiting for the bot to go idle.
+    
+    Args:
+        work_q (queue.Queue): The bot's lead queue
+        lead_demand (threading.Event): Set to ask the producer for more
+        
+    Returns:
+        list: Up to BATCH_SIZE lead records
+    """
+    if work_q.empty():
+        lead_demand.set()
+    leads = [work_q.get()]
+    while len(leads) < BATCH_SIZE:
+        try:
+            leads.append(work_q.get_nowait())
+        except queue.Empty:
+            break
+    
+    # Prefetch the next batch while this one is being sent
+    if work_q.empty():
+        lead_demand.set()
+    return leads
+
+
+def retire_bot(bot_name, bot_queues):
+    """
+    Stop routing leads to a bot and hand its queued leads back, so polls
+    can return them again for the other bots.
+    
+    Args:
+        bot_name (str): Bot identifier
+        bot_queues (dict): Bot name -> lead queue, shared with lead_producer
+    """
+    with pending_lock:
+        work_q = bot_queues.pop(bot_name, None)
+        while work_q is not None:
+            try:
+                pending_phones.discard(str(work_q.get_nowait().Phone))
+            except queue.Empty:
+                break
+
+
+def run_bot(bot_name, profile_path, bot_queues, lead_demand, start_barrier):
+    """
+    Main bot loop - continuously processes leads from its queue.
     
     Args:
         bot_name (str): Bot identifier
-        campuses (list): List of campuses to process
         profile_path (str): Chrome profile path
+        bot_queues (dict): Bot name -> lead queue routed by lead_producer
+        lead_demand (threading.Event): Set to ask the producer for more
+        start_barrier (threading.Barrier): Shared by all bots; passed once
+            every session has loaded (or failed)
     """
-    logger.info(f"[{bot_name}] Starting bot for campuses: {campuses}")
+    logger.info(f"[{bot_name}] Starting bot for campuses: {BOTS_CONFIG[bot_name]['campuses']}")
     
-    # Setup Chrome driver
-    driver = whatsapp_helper.setup_driver(profile_path, bot_name)
-    if not driver:
-        logger.critical(f"[{bot_name}] Failed to initialize driver")
-        return
+    # Open (or reuse) the bot's WhatsApp Web session, then start
+    # processing in lockstep once every bot has logged in. The barrier is
+    # reached even if opening raises, and a slow bot only holds the
+    # others for STARTUP_TIMEOUT seconds
+    driver = None
+    try:
+        driver = whatsapp_helper.open_session(profile_path, bot_name)
+    except Exception as e:
+        logger.error(f"[{bot_name}] Error opening WhatsApp session: {e}")
+    finally:
+        try:
+            start_barrier.wait(timeout=STARTUP_TIMEOUT)
+        except threading.BrokenBarrierError:
+            logger.warning(f"[{bot_name}] Not all bots ready, starting anyway")
     
-    # Load WhatsApp Web
-    driver.get("https://web.whatsapp.com")
-    if not whatsapp_helper.wait_for_whatsapp_load(driver, bot_name):
-        driver.quit()
+    if not driver:
+        logger.critical(f"[{bot_name}] Failed to open WhatsApp session")
+        retire_bot(bot_name, bot_queues)
         return
     
-    # Track processed phones to avoid duplicates
-    processed_phones = set()
+    work_q = bot_queues[bot_name]
     
     # Main loop
     while True:
         try:
-            # Fetch new leads from database
-            leads = db_helper.fetch_leads(campuses, processed_phones, BATCH_SIZE)
-            
-            if not leads:
-                time.sleep(POLL_INTERVAL)
-                continue
-            
+            leads = next_batch(work_q, lead_demand)
             logger.success(f"[{bot_name}] Processing {len(leads)} leads")
             results = []
             
-            # Process each lead
-            for lead in leads:
-                result = process_lead(driver, lead, bot_name)
-                if result:
+            # Process each lead, handing its result to the insert thread.
+            # The bot does not wait for the insert: a lead stays in
+            # pending_phones until its row is saved, so a slow or down DB
+            # only delays the inserts, never the senders
+            try:
+                for lead in leads:
+                    result = process_lead(driver, lead, bot_name)
+                    INSERT_EXEC.submit(save_lead_status, result, str(lead.Phone))
                     results.append(result)
-                    processed_phones.add(str(lead.Phone))
+            except Exception:
+                # The failing lead may already have been messaged, so record
+                # it as an error; the untouched rest go back to the producer
+                failed = leads[len(results)]
+                INSERT_EXEC.submit(
+                    save_lead_status, lead_status_row(failed, "Error"), str(failed.Phone)
+                )
+                release_phones(str(lead.Phone) for lead in leads[len(results) + 1:])
+                raise
             
-            # Save results to database
-            if results:
-                db_helper.insert_lead_status(results)
-                
-                sent_count = sum(1 for r in results if r['Status_lead'] == 'Sent')
-                logger.info(f"[{bot_name}] Batch complete: {sent_count} sent")
+            sent_count = sum(1 for r in results if r.Status_lead == 'Sent')
+            logger.info(f"[{bot_name}] Batch complete: {sent_count} sent")
             
         except KeyboardInterrupt:
             logger.warning(f"[{bot_name}] Keyboard interrupt received")
@@ -273,15 +521,66 @@ def run_bot(bot_name, campuses, profile_path):
             time.sleep(POLL_INTERVAL)
     
     # Cleanup
-    driver.quit()
+    retire_bot(bot_name, bot_queues)
+    whatsapp_helper.close_session(bot_name)
     logger.info(f"[{bot_name}] Bot stopped")
 
 
+def inhibit_idle():
+    """
+    Ask the OS to keep the system and display awake.
+    
+    On Windows this is one SetThreadExecutionState call, which holds while
+    the calling thread lives. On Linux a systemd-inhibit child waits on a
+    pipe from this process, so it exits (releasing the inhibitor) as soon
+    as the bot does, even on a crash; it is also terminated at exit.
+    
+    Returns:
+        bool: True if an OS-level inhibitor is in place
+    """
+    if sys.platform == "win32":
+        flags = ES_CONTINUOUS | ES_SYSTEM_REQUIRED | ES_DISPLAY_REQUIRED
+        try:
+            return bool(ctypes.windll.kernel32.SetThreadExecutionState(flags))
+        except (AttributeError, OSError):
+            return False
+    
+    if sys.platform.startswith("linux") and shutil.which("systemd-inhibit"):
+        try:
+            # 'cat' blocks on our end of the pipe until this process exits
+            inhibitor = subprocess.Popen(
+                ["systemd-inhibit", "--what=idle:sleep", "--who=whatsapp-bot",
+                 "--why=Sending WhatsApp messages", "cat"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            atexit.register(inhibitor.terminate)
+            return True
+        except OSError:
+            return False
+    
+    return False
+
+
 def anti_lock_thread():
     """
     Background thread to prevent system sleep/lock.
-    Simulates mouse and keyboard activity at regular intervals.
+    Uses an OS-level idle inhibitor, falling back to simulated mouse and
+    keyboard activity at regular intervals when none is available.
     """
+    if inhibit_idle():
+        logger.info("Anti-lock system started (OS idle inhibitor)")
+        # Keep the thread alive: the Windows execution state is per-thread
+        while True:
+            time.sleep(3600)
+    
+    try:
+        import pyautogui
+    except ImportError:
+        logger.warning("Anti-lock unavailable: no OS inhibitor and pyautogui not installed")
+        return
+    
     logger.info("Anti-lock system started")
     
     while True:
@@ -332,20 +631,53 @@ def daily_report_task():
         
     except Exception as e:
         logger.error(f"Daily report generation failed: {e}")
+    finally:
+        # Each report runs on a fresh Timer thread; don't leave its
+        # connection behind
+        db_helper.release()
 
 
-def scheduler_thread():
+def next_occurrence(time_str, after):
     """
-    Background thread for scheduled tasks (daily reports).
+    Return the first local datetime after a moment at a given time of day.
+    
+    Args:
+        time_str (str): Time of day as HH:MM or HH:MM:SS
+        after (datetime): Moment the occurrence must follow
+        
+    Returns:
+        datetime: Next occurrence of time_str strictly after `after`
     """
-    report_time = DAILY_REPORT_TIME.strip()
-    logger.info(f"Scheduler started - Daily report at {report_time}")
+    hour, minute, second = (list(map(int, time_str.split(":"))) + [0])[:3]
+    run_at = after.replace(hour=hour, minute=minute, second=second, microsecond=0)
+    if run_at <= after:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+def schedule_daily_report(after=None):
+    """
+    Arm a one-shot timer for the next daily report; it re-arms itself
+    after firing, so nothing wakes up between reports.
     
-    schedule.every().day.at(report_time).do(daily_report_task)
+    Args:
+        after (datetime, optional): Schedule the first report after this
+            moment (defaults to now)
+    """
+    after = max(after or datetime.now(), datetime.now())
+    run_at = next_occurrence(DAILY_REPORT_TIME.strip(), after)
     
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    def fire():
+        try:
+            daily_report_task()
+        finally:
+            # Step past run_at so an early wake-up cannot fire twice
+            schedule_daily_report(after=run_at)
+    
+    timer = threading.Timer((run_at - datetime.now()).total_seconds(), fire)
+    timer.daemon = True
+    timer.start()
+    logger.debug(f"Next daily report at {run_at:%Y-%m-%d %H:%M:%S}")
 
 
 def main():
@@ -361,23 +693,34 @@ def main():
     # Start anti-lock thread
     threading.Thread(target=anti_lock_thread, daemon=True).start()
     
-    # Start scheduler thread
-    threading.Thread(target=scheduler_thread, daemon=True).start()
+    # Schedule daily reports
+    logger.info(f"Scheduler started - Daily report at {DAILY_REPORT_TIME.strip()}")
+    schedule_daily_report()
     
     # Wait for user confirmation
     input("\nPress ENTER to start all bots...\n")
     
+    # One bounded lead queue per bot, fed by a single producer thread
+    bot_queues = {bot_name: queue.Queue(maxsize=BATCH_SIZE) for bot_name in BOTS_CONFIG}
+    lead_demand = threading.Event()
+    threading.Thread(
+        target=lead_producer,
+        args=(bot_queues, lead_demand),
+        daemon=True
+    ).start()
+    
     # Launch all bots in separate threads
+    start_barrier = threading.Barrier(len(BOTS_CONFIG))
     bot_threads = []
     for bot_name, config in BOTS_CONFIG.items():
         thread = threading.Thread(
             target=run_bot,
-            args=(bot_name, config["campuses"], config["profile"]),
+            args=(bot_name, config["profile"], bot_queues,
+                  lead_demand, start_barrier),
             daemon=True
         )
         thread.start()
         bot_threads.append(thread)
-        time.sleep(15)  # Stagger bot launches
     
     logger.success(f"All {len(BOTS_CONFIG)} bots launched successfully!")
     
@@ -387,6 +730,14 @@ def main():
             time.sleep(60)
     except KeyboardInterrupt:
         logger.warning("Shutting down all bots...")
+        whatsapp_helper.close_all_sessions()
+        # WTP jobs queue emails on ATP, so drain it first; close the SMTP
+        # and DB connections only once every queued job has finished
+        WTP.shutdown(wait=True)
+        INSERT_EXEC.shutdown(wait=True)
+        ATP.shutdown(wait=True)
+        email_helper.shutdown(wait=True)
+        db_helper.close()
 
 
 if __name__ == "__main__":
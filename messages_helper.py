@@ -171,6 +171,11 @@ CREATE TABLE Lead_status (
 -- Create index for better performance
 CREATE INDEX idx_datetime ON Lead_status(Date_time);
 CREATE INDEX idx_campus ON Lead_status(mx_Program_Campus);
+
+-- Index for the lead polling query on the source table
+CREATE INDEX IX_DUMY_LIVEDB_Phone_Owner
+    ON DUMY_LIVEDB(OwnerIdName, Phone)
+    INCLUDE (FirstName, mx_Program_Name, mx_Program_Campus);
 ```
 
 ### 9. First Run - Login to WhatsApp
@@ -0,0 +1,13 @@
+-- Covering index for DatabaseHelper.get_daily_stats.
+-- The daily report filters Lead_status on a half-open Date_time range and
+-- aggregates by campus/status, so this index lets it seek on today's rows
+-- without touching the base table.
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_Lead_status_Date_time'
+      AND object_id = OBJECT_ID('Lead_status')
+)
+    CREATE INDEX IX_Lead_status_Date_time
+        ON Lead_status(Date_time)
+        INCLUDE (mx_Program_Campus, Status_lead);
@@ -0,0 +1,8 @@
+-- Table type for the processed-phone exclusion in DatabaseHelper.fetch_leads_for_groups.
+-- Moderate sets of already processed phones are sent as a single
+-- table-valued parameter of this type instead of a long NOT IN list.
+
+IF TYPE_ID('dbo.PhoneList') IS NULL
+    CREATE TYPE dbo.PhoneList AS TABLE (
+        Phone VARCHAR(50) PRIMARY KEY
+    );
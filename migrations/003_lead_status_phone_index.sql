@@ -0,0 +1,11 @@
+-- Index for the recent Lead_status exclusion in DatabaseHelper.fetch_leads_for_groups.
+-- Each candidate lead is checked for a Lead_status row with the same phone
+-- in the last day; this index turns that check into a single seek.
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_Lead_status_Phone_Date_time'
+      AND object_id = OBJECT_ID('Lead_status')
+)
+    CREATE INDEX IX_Lead_status_Phone_Date_time
+        ON Lead_status(Phone, Date_time);
@@ -0,0 +1,19 @@
+-- Replaces IX_Lead_status_Phone_Date_time (003): the Lead_status exclusion
+-- in DatabaseHelper.fetch_leads_for_groups now also skips any phone with a
+-- 'Sent' row, so Status_lead is included to keep the check a single seek.
+
+IF EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_Lead_status_Phone_Date_time'
+      AND object_id = OBJECT_ID('Lead_status')
+)
+    DROP INDEX IX_Lead_status_Phone_Date_time ON Lead_status;
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_Lead_status_Phone_Date_time_Status'
+      AND object_id = OBJECT_ID('Lead_status')
+)
+    CREATE INDEX IX_Lead_status_Phone_Date_time_Status
+        ON Lead_status(Phone, Date_time)
+        INCLUDE (Status_lead);
@@ -0,0 +1,14 @@
+-- Lead_status.Phone now stores the source DUMY_LIVEDB.Phone without '+'
+-- (previously the cleaned number without '+'), which is what the lead
+-- poll's Lead_status exclusion matches on. Rewrite older rows whose cleaned
+-- number differs from the source only by spaces, dashes or parentheses so
+-- those leads stay excluded. Rows where cleaning changed more (e.g. added a
+-- country code) cannot be mapped back and are left as they are.
+
+UPDATE ls
+SET ls.Phone = REPLACE(d.Phone, '+', '')
+FROM Lead_status ls
+JOIN DUMY_LIVEDB d
+    ON ls.Phone = REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
+           d.Phone, '+', ''), ' ', ''), '-', ''), '(', ''), ')', '')
+WHERE ls.Phone <> REPLACE(d.Phone, '+', '');